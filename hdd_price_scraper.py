@@ -1,13 +1,36 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter, Retry
+from urllib3.util import connection as _urllib3_connection
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
+import lxml.html
+from lxml.cssselect import CSSSelector
 import pandas as pd
 import re
+import functools
+import hashlib
+import sys
 import time
 import random
 import logging
 import datetime
 import os
 import json
+import gzip
+try:
+    import orjson # C-accelerated JSON; optional, stdlib json is the fallback
+except ImportError:
+    orjson = None
+try:
+    # Optional; adds a .br precompressed report next to the .gz. Expects
+    # Google's 'Brotli' package (Compressor.process/finish); brotlipy ships
+    # the same import name with a different API, which the save step tolerates.
+    import brotli
+except ImportError:
+    brotli = None
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
 
 # --- Selenium Imports ---
 from selenium import webdriver
@@ -27,7 +50,9 @@ HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:138.0) Gecko/20100101 Firefox/138.0',
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
     'Accept-Language': 'en-US,en;q=0.5',
-    'Accept-Encoding': 'gzip, deflate, br',
+    # Advertise only codings requests can always decode transparently; 'br'
+    # silently returns undecoded bodies unless a brotli package is installed.
+    'Accept-Encoding': 'gzip, deflate',
     'DNT': '1',
     'Connection': 'keep-alive',
     'Upgrade-Insecure-Requests': '1',
@@ -45,147 +70,465 @@ MIN_DELAY_S = 4
 MAX_DELAY_S = 8
 REQUEST_TIMEOUT = 30 # Timeout for requests library
 
+# Short-TTL DNS cache: every new urllib3 socket goes through
+# connection.create_connection, so wrapping it lets later connections reuse
+# the IP resolved by the first one instead of repeating getaddrinfo — which
+# glibc serializes behind a single resolver mutex, a real stall when the
+# parallel Amazon page fetches all open sockets at once. TLS is unaffected:
+# urllib3 sets SNI/verification from the pool's hostname, not this address.
+_DNS_CACHE = {}
+_DNS_TTL_S = 300
+_orig_create_connection = _urllib3_connection.create_connection
+
+def _cached_create_connection(address, *args, **kwargs):
+    host, port = address
+    cached = _DNS_CACHE.get((host, port))
+    if cached is not None and time.monotonic() - cached[1] < _DNS_TTL_S:
+        try:
+            return _orig_create_connection((cached[0], port), *args, **kwargs)
+        except OSError:
+            # The recorded IP stopped answering (CDN rotation, failover);
+            # evict it and fall through to a fresh getaddrinfo below rather
+            # than redialing a dead address for the rest of the TTL.
+            _DNS_CACHE.pop((host, port), None)
+    sock = _orig_create_connection(address, *args, **kwargs)
+    try:
+        _DNS_CACHE[(host, port)] = (sock.getpeername()[0], time.monotonic())
+    except OSError:
+        pass
+    return sock
+
+_urllib3_connection.create_connection = _cached_create_connection
+
+# One long-lived pooled session for all requests-based fetching. Keep-alive
+# connections survive across pages and across retailers (should more scrapers
+# move off Selenium), so the TCP+TLS handshake is paid once per host per run.
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    # Only genuine 5xx transients are retried. 429/503 are how Amazon
+    # rate-limits and bot-walls: retrying them hammers a host that is already
+    # throttling us, and the terminal RetryError would bypass the explicit
+    # blocked-status classification in _scrape_amazon_page.
+    max_retries=Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 504]),
+))
+
+# Pre-compiled CSS selectors for the hot item-container lookups. soup.select()
+# compiles its selector string on every call; these are compiled once at import.
+_NEWEGG_ITEM_SEL = soupsieve.compile('div.item-cell')
+_SPD_ITEM_SEL = soupsieve.compile('div.boost-pfs-filter-product-item-inner')
+
+# Strainers so BeautifulSoup only materializes the subtrees each parse actually
+# reads: the item containers for the product soups, and just the headings/
+# controls the block detector inspects instead of the whole rendered page.
+_NEWEGG_ITEM_STRAINER = SoupStrainer('div', class_='item-cell')
+_SPD_ITEM_STRAINER = SoupStrainer('div', class_='boost-pfs-filter-product-item-inner')
+_BLOCK_CHECK_STRAINER = SoupStrainer(['h1', 'h2', 'h3', 'title', 'button', 'input'])
+
+# The Amazon item loop runs on lxml directly: each CSSSelector is translated to
+# XPath once at import and evaluated by lxml's C-level tree traversal, several
+# times faster than the equivalent BeautifulSoup .select() calls per item.
+_AMZN_ITEMS_SEL = CSSSelector('div[data-component-type="s-search-result"]')
+_AMZN_ITEMS_FALLBACK_SEL = CSSSelector('div.s-result-item[data-asin]')
+_AMZN_SPONSORED_SEL = CSSSelector('span.s-label-popover-default, span.puis-sponsored-label-text')
+_AMZN_TITLE_CONTAINER_SEL = CSSSelector('div[data-cy="title-recipe"]')
+_AMZN_TITLE_LINK_SEL = CSSSelector('a.a-link-normal.s-underline-link-text.a-text-normal, a.a-link-normal')
+_AMZN_TITLE_H2_SEL = CSSSelector('h2.a-size-medium.a-color-base.a-text-normal, h2.a-size-base-plus.a-color-base.a-text-normal')
+_AMZN_TITLE_SPAN_SEL = CSSSelector('span')
+_AMZN_PRICE_OFFSCREEN_SEL = CSSSelector('span.a-price > span.a-offscreen')
+_AMZN_PRICE_WHOLE_SEL = CSSSelector('span.a-price-whole')
+_AMZN_PRICE_FRACTION_SEL = CSSSelector('span.a-price-fraction')
+_AMZN_PRICE_ANY_SEL = CSSSelector('span.a-price')
+
+def _sel_first(selector, element):
+    """Returns the first match of a compiled CSSSelector, or None."""
+    found = selector(element)
+    return found[0] if found else None
+
+# Price cleanup patterns, compiled once: these run for every scraped item, and
+# calling re.sub with a literal pattern pays the re-cache lookup on each call.
+_PRICE_STRIP_RE = re.compile(r'(?:USD|CAD|EUR|GBP|\$|£|€|,)')
+_PRICE_TAIL_RE = re.compile(r'\s.*')
+
+# Precompiled capacity patterns, searched TB-first: a TB figure anywhere in
+# the title outranks a GB one (mixed-unit titles like "500GB SSD + 2TB HDD"
+# must report 2, not 0.5), so the two scans cannot be fused into a single
+# leftmost-match alternation. Compiling once at import is the win; a second
+# scan over a ~100-char title is noise.
+# IGNORECASE keeps the patterns correct for any casing; parse_capacity_tb
+# lowercases once anyway for its substring prefilter and searches that same
+# copy. Unicode \s is required: scraped titles carry NBSP/thin-space between
+# number and unit (&nbsp; survives get_text()), which re.ASCII would miss.
+_CAPACITY_TB_RE = re.compile(r'(\d{1,3})\s*(?:tb|terabyte)\b', re.IGNORECASE)
+_CAPACITY_GB_RE = re.compile(r'(\d{3,5})\s*(?:gb|gigabyte)\b', re.IGNORECASE)
+
+# Captures the 10-character ASIN out of an Amazon product href in one pass.
+_ASIN_RE = re.compile(r'/(?:dp|gp/product)/([A-Z0-9]{10})')
+
+# Bot-wall check on raw response bytes: avoids decoding + lowercasing a 1-2 MB
+# body (two full copies) just to test a couple of substrings.
+_AMZN_BLOCK_RE = re.compile(rb'captcha|robot check', re.IGNORECASE)
+
 # --- Helper Functions ---
 
 def parse_price(price_str):
     """Cleans price strings and returns a float."""
     if not price_str: return None
     try:
-        price_str = re.sub(r'(?:USD|CAD|EUR|GBP|\$|£|€|,)', '', price_str)
+        price_str = _PRICE_STRIP_RE.sub('', price_str)
         price_str = price_str.split('-')[0] # Handle price ranges
-        price_str = re.sub(r'\s.*', '', price_str) # Remove text after first space
+        price_str = _PRICE_TAIL_RE.sub('', price_str) # Remove text after first space
         return float(price_str.strip())
     except (ValueError, TypeError):
         logging.warning(f"Could not parse price: '{price_str}'")
         return None
 
+@functools.lru_cache(maxsize=4096)
 def parse_capacity_tb(title):
-    """Extracts capacity in TB from a string. Case-insensitive."""
+    """Extracts capacity in TB from a string. Case-insensitive.
+
+    A TB figure anywhere in the title outranks a GB one; GB is only a
+    fallback when no TB figure exists at all.
+    """
     if not title: return None
     title_lower = title.lower()
-    tb_match = re.search(r'(\d{1,3})\s*(?:tb|terabyte)\b', title_lower)
-    if tb_match: return int(tb_match.group(1))
-    gb_match = re.search(r'(\d{3,5})\s*(?:gb|gigabyte)\b', title_lower)
-    if gb_match: return round(int(gb_match.group(1)) / 1000.0, 2)
+    # C-level substring scans are far cheaper than engaging the regex engine,
+    # and titles without a capacity contain none of these markers. ('terabyte'/
+    # 'gigabyte' contain neither 'tb' nor 'gb', hence the 'byte' check.)
+    if 'tb' not in title_lower and 'gb' not in title_lower and 'byte' not in title_lower:
+        return None
+    match = _CAPACITY_TB_RE.search(title_lower)
+    if match: return int(match.group(1))
+    match = _CAPACITY_GB_RE.search(title_lower)
+    if match: return round(int(match.group(1)) / 1000.0, 2)
     return None
 
+_last_request_ts = None
+
 def polite_delay():
-    """Waits for a random time."""
+    """Rate-limits requests to a random spacing, crediting time already spent
+    parsing/working since the previous request instead of sleeping on top of it."""
+    global _last_request_ts
     delay = random.uniform(MIN_DELAY_S, MAX_DELAY_S)
-    logging.info(f"Waiting for {delay:.2f} seconds...")
-    time.sleep(delay)
+    now = time.monotonic()
+    if _last_request_ts is not None:
+        delay -= now - _last_request_ts
+    if delay > 0:
+        logging.info(f"Waiting for {delay:.2f} seconds...")
+        time.sleep(delay)
+    _last_request_ts = time.monotonic()
+
+def _page_html(driver):
+    """Returns the serialized document HTML in a single script evaluation.
+
+    `driver.page_source` marshals the whole DOM through WebDriver's dedicated
+    (and slower) endpoint; asking the page for `outerHTML` hands back the
+    already-serialized string in one round trip.
+    """
+    return driver.execute_script("return document.documentElement.outerHTML")
+
+def _detect_block(page_source, blocking_keywords):
+    """Checks a rendered page for prominent blocking text (CAPTCHA walls etc).
+
+    The caller passes page_source so the expensive Selenium DOM serialization
+    happens exactly once; the page is lowercased once, parsed once (strained to
+    headings/title/controls), and every keyword is tested against that small
+    set of texts. Returns the first prominent keyword, or None.
+    """
+    source_lower = page_source.lower()
+    candidates = [k for k in blocking_keywords if k in source_lower]
+    if not candidates:
+        return None
+    soup = BeautifulSoup(page_source, 'lxml', parse_only=_BLOCK_CHECK_STRAINER)
+    prominent_texts = {tag.get_text(strip=True).lower() for tag in soup.find_all(['h1', 'h2', 'h3', 'title', 'button'])}
+    prominent_texts.update(inp.get('value', '').lower() for inp in soup.find_all('input', type='submit'))
+    for keyword in candidates:
+        if any(keyword in text for text in prominent_texts):
+            return keyword
+        logging.debug(f"Keyword '{keyword}' found in page source, but not prominently.")
+    return None
 
-def create_html_link(title, url):
-    """Creates an HTML anchor tag string."""
-    if not url or not isinstance(url, str) or not url.startswith('http'):
-        return title
-    safe_title = title.replace('"', '"')
-    return f'<a href="{url}" target="_blank" rel="noopener noreferrer" title="{safe_title}">{title}</a>'
+def _dumps_json(obj):
+    """Serializes report data to a JSON string, via orjson when installed.
+
+    orjson formats numbers/strings in C and emits minified output, so the
+    embedded payload is both faster to produce and smaller on disk.
+    OPT_SERIALIZE_NUMPY covers any numpy scalars that leak out of the
+    DataFrame instead of raising TypeError the way stdlib json would.
+    """
+    if orjson is not None:
+        serialized = orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    else:
+        serialized = json.dumps(obj, separators=(',', ':'))
+    # The result is interpolated into an inline <script> block: a scraped
+    # title containing '</script>' would terminate it and inject markup.
+    # '<\/' is the same JSON but inert in HTML.
+    return serialized.replace('</', '<\\/')
+
+# --- Selenium Driver Helpers ---
+
+_GECKO_PATH = None
+
+# Shared, immutable driver options built once at import instead of per driver.
+# permissions.default.image=2 disables image loading entirely: the retailer
+# pages are image-heavy and the scrapers only read HTML text, so this cuts
+# most of the transferred bytes and a large share of page-load time.
+_FIREFOX_OPTIONS = FirefoxOptions()
+if 'User-Agent' in HEADERS: _FIREFOX_OPTIONS.add_argument(f'user-agent={HEADERS["User-Agent"]}')
+_FIREFOX_OPTIONS.add_argument("--headless")
+_FIREFOX_OPTIONS.add_argument("--disable-gpu")
+_FIREFOX_OPTIONS.add_argument("--window-size=1920,1080")
+_FIREFOX_OPTIONS.set_preference("permissions.default.image", 2)
+
+def _gecko_path():
+    """Resolves the geckodriver binary once per process.
+
+    GeckoDriverManager().install() does a version check (network/disk) on every
+    call; cache the resolved path so later driver starts reuse it instantly.
+    """
+    global _GECKO_PATH
+    if _GECKO_PATH is None:
+        os.environ['WDM_LOG_LEVEL'] = '0'
+        _GECKO_PATH = GeckoDriverManager().install()
+    return _GECKO_PATH
+
+def _new_firefox_driver():
+    """Builds a headless Firefox driver with the scraper's standard options."""
+    service = FirefoxService(_gecko_path())
+    driver = webdriver.Firefox(service=service, options=_FIREFOX_OPTIONS)
+    logging.info("Selenium Firefox driver initialized.")
+    return driver
+
+@contextmanager
+def firefox_driver():
+    """Context manager yielding a headless Firefox driver.
+
+    Lets several scrapes share one browser so driver startup/teardown
+    (geckodriver resolution, process spawn, profile creation) is paid once
+    per run instead of once per site.
+    """
+    driver = _new_firefox_driver()
+    try:
+        yield driver
+    finally:
+        try:
+            driver.quit()
+            logging.info("Selenium Firefox driver quit.")
+        except Exception as quit_error:
+            logging.error(f"Error quitting shared Selenium driver: {quit_error}")
 
 # --- Scraping Functions ---
 
+def _scrape_amazon_page(session, base_url, url, page, stagger_s):
+    """Fetches and parses one Amazon search page (runs in a worker thread).
+
+    Returns (status, items): status is 'ok', 'captcha', 'blocked', 'empty' or
+    'error'; items is a list of (asin, data) tuples in on-page order.
+    """
+    if stagger_s > 0: time.sleep(stagger_s)
+    logging.info(f"Requesting Amazon page {page}: {url}")
+    response = None
+    try:
+        response = session.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        if _AMZN_BLOCK_RE.search(response.content):
+             logging.warning(f"CAPTCHA detected on Amazon page {page}.")
+             return 'captcha', []
+    except requests.exceptions.Timeout:
+        logging.error(f"Timeout error requesting Amazon page {page}: {url}")
+        return 'error', []
+    except requests.exceptions.HTTPError as e:
+         logging.error(f"HTTP error requesting Amazon page {page}: {e.response.status_code} {e.response.reason} for URL: {url}")
+         if e.response.status_code in [403, 404, 503]:
+             logging.error(f"Received {e.response.status_code}. Amazon might be blocking requests.")
+             if response: logging.debug(f"Response text (start): {response.text[:500]}")
+             return 'blocked', []
+         return 'error', []
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Generic error requesting Amazon page {page}: {e}")
+        return 'error', []
+
+    tree = lxml.html.fromstring(response.content)
+    items = _AMZN_ITEMS_SEL(tree)
+    logging.debug(f"Found {len(items)} potential items on page {page} using primary selector.")
+    if not items:
+         items = _AMZN_ITEMS_FALLBACK_SEL(tree)
+         logging.debug(f"Primary selector failed. Found {len(items)} using fallback 'div.s-result-item[data-asin]'.")
+    if not items:
+        return 'empty', []
+
+    parsed = []
+    for item in items:
+        sponsored_tag = _sel_first(_AMZN_SPONSORED_SEL, item)
+        if sponsored_tag is not None and ('Sponsored' in sponsored_tag.text_content()): continue
+
+        data = {'Retailer': 'Amazon'}
+        title_container = _sel_first(_AMZN_TITLE_CONTAINER_SEL, item)
+        if title_container is None: continue
+        link_element = _sel_first(_AMZN_TITLE_LINK_SEL, title_container)
+        if link_element is None: continue
+
+        href = link_element.get('href')
+        if not href or not href.startswith('/'): continue
+        asin_match = _ASIN_RE.search(href)
+        if not asin_match: continue
+        # Intern the ASIN so the cross-page dedup dict compares by pointer.
+        asin = sys.intern(asin_match.group(1))
+        data['URL'] = base_url + href
+
+        title_h2 = _sel_first(_AMZN_TITLE_H2_SEL, link_element)
+        if title_h2 is not None:
+            title_span = _sel_first(_AMZN_TITLE_SPAN_SEL, title_h2)
+            title_el = title_span if title_span is not None else title_h2
+        else:
+            title_el = link_element
+        data['Title'] = ' '.join(title_el.text_content().split())
+        if not data.get('Title'): continue
+
+        price_element = _sel_first(_AMZN_PRICE_OFFSCREEN_SEL, item)
+        price_str = None
+        if price_element is not None: price_str = price_element.text_content().strip()
+        else:
+            price_whole = _sel_first(_AMZN_PRICE_WHOLE_SEL, item)
+            price_fraction = _sel_first(_AMZN_PRICE_FRACTION_SEL, item)
+            if price_whole is not None and price_fraction is not None:
+                price_str = price_whole.text_content().strip() + price_fraction.text_content().strip()
+            else:
+                price_any = _sel_first(_AMZN_PRICE_ANY_SEL, item)
+                if price_any is not None: price_str = price_any.text_content().strip()
+
+        if price_str:
+            data['Price'] = parse_price(price_str)
+            if data['Price'] is None: continue
+        else: continue
+
+        data['Capacity (TB)'] = parse_capacity_tb(data.get('Title'))
+        if not data['Capacity (TB)']: continue
+
+        if data.get('Price') and data.get('Capacity (TB)') and data.get('URL') and data.get('Title'):
+            parsed.append((asin, data))
+
+    logging.info(f"Successfully parsed {len(parsed)} valid items from Amazon page {page}.")
+    return 'ok', parsed
+
+
 def scrape_amazon(search_term, max_pages=1):
-    """Scrapes Amazon search results using requests."""
+    """Scrapes Amazon search results using requests, fetching pages in parallel."""
     logging.info(f"--- Scraping Amazon for '{search_term}' (Max Pages: {max_pages}) ---")
-    results = []
     base_url = "https://www.amazon.com"
     search_url_template = base_url + "/s?k={query}&i=computers&rh=n%3A1254762011&ref=nb_sb_noss"
+    query = '+'.join(search_term.split())
 
-    session = requests.Session()
-    session.headers.update(HEADERS)
-
-    for page in range(1, max_pages + 1):
-        query = '+'.join(search_term.split())
-        url = f"{search_url_template.format(query=query)}&page={page}"
-        logging.info(f"Requesting Amazon page {page}: {url}")
-        response = None
-        try:
-            polite_delay()
-            response = session.get(url, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
-            if "captcha" in response.text.lower() or "robot check" in response.text.lower():
-                 logging.warning(f"CAPTCHA detected on Amazon page {page}. Stopping Amazon scrape.")
-                 break
-        except requests.exceptions.Timeout:
-            logging.error(f"Timeout error requesting Amazon page {page}: {url}")
-            continue
-        except requests.exceptions.HTTPError as e:
-             logging.error(f"HTTP error requesting Amazon page {page}: {e.response.status_code} {e.response.reason} for URL: {url}")
-             if e.response.status_code in [403, 404, 503]:
-                 logging.error(f"Received {e.response.status_code}. Amazon might be blocking requests.")
-                 if response: logging.debug(f"Response text (start): {response.text[:500]}")
-                 break
-             continue
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Generic error requesting Amazon page {page}: {e}")
-            continue
-
-        soup = BeautifulSoup(response.content, 'lxml')
-        items = soup.select('div[data-component-type="s-search-result"]')
-        logging.debug(f"Found {len(items)} potential items on page {page} using primary selector.")
-        if not items:
-             items = soup.select('div.s-result-item[data-asin]')
-             logging.debug(f"Primary selector failed. Found {len(items)} using fallback 'div.s-result-item[data-asin]'.")
-
-        if not items and page == 1:
-             logging.warning("No items found on Amazon page 1.")
-             break
-        if not items and page > 1:
-             logging.info(f"No items found on Amazon page {page}. Assuming end of results.")
-             break
-
-        item_count_on_page = 0
-        for item in items:
-            sponsored_tag = item.select_one('span.s-label-popover-default, span.puis-sponsored-label-text')
-            if sponsored_tag and ('Sponsored' in sponsored_tag.get_text(strip=True)): continue
-
-            data = {'Retailer': 'Amazon'}
-            title_container = item.select_one('div[data-cy="title-recipe"]')
-            if not title_container: continue
-            link_element = title_container.select_one('a.a-link-normal.s-underline-link-text.a-text-normal, a.a-link-normal')
-            if not link_element: continue
-
-            href = link_element.get('href')
-            if href and href.startswith('/') and ('/dp/' in href or '/gp/product/' in href):
-                data['URL'] = base_url + href
-            else: continue
-
-            title_h2 = link_element.select_one('h2.a-size-medium.a-color-base.a-text-normal, h2.a-size-base-plus.a-color-base.a-text-normal')
-            if title_h2:
-                title_span = title_h2.select_one('span')
-                data['Title'] = title_span.get_text(strip=True) if title_span else title_h2.get_text(strip=True)
-            else: data['Title'] = link_element.get_text(strip=True).strip()
-            if not data.get('Title'): continue
-
-            price_element = item.select_one('span.a-price > span.a-offscreen')
-            price_str = None
-            if price_element: price_str = price_element.get_text(strip=True)
-            else:
-                price_whole = item.select_one('span.a-price-whole')
-                price_fraction = item.select_one('span.a-price-fraction')
-                if price_whole and price_fraction: price_str = price_whole.get_text(strip=True) + price_fraction.get_text(strip=True)
-                elif item.select_one('span.a-price'): price_str = item.select_one('span.a-price').get_text(strip=True)
+    # All pages hit the same host, so fetch them concurrently over the shared
+    # session's pool. A small per-page stagger keeps the requests from landing
+    # simultaneously without serializing on the full polite delay.
+    # One insertion-ordered dict does duplicate detection and collection in a
+    # single structure; merging in page order keeps results deterministic.
+    results_by_asin = {}
+    with ThreadPoolExecutor(max_workers=max_pages) as executor:
+        page_futures = [
+            executor.submit(_scrape_amazon_page, _SESSION, base_url,
+                            f"{search_url_template.format(query=query)}&page={page}",
+                            page, (page - 1) * random.uniform(1.0, 2.5))
+            for page in range(1, max_pages + 1)
+        ]
+        for page, future in enumerate(page_futures, start=1):
+            status, page_items = future.result()
+            if status in ('captcha', 'blocked'):
+                logging.warning(f"Stopping Amazon scrape at page {page} ({status}).")
+                break
+            if status == 'empty':
+                if page == 1: logging.warning("No items found on Amazon page 1.")
+                else: logging.info(f"No items found on Amazon page {page}. Assuming end of results.")
+                break
+            for asin, data in page_items:
+                if asin not in results_by_asin:
+                    results_by_asin[asin] = data
+
+    results = list(results_by_asin.values())
+    logging.info(f"Finished scraping Amazon. Found a total of {len(results)} valid items.")
+    return results
 
-            if price_str:
-                data['Price'] = parse_price(price_str)
-                if data['Price'] is None: continue
-            else: continue
 
-            data['Capacity (TB)'] = parse_capacity_tb(data.get('Title'))
-            if not data['Capacity (TB)']: continue
+def _scrape_newegg_api(search_term, page_size=96):
+    """Fetches Newegg search results from the product-list JSON endpoint.
 
-            if data.get('Price') and data.get('Capacity (TB)') and data.get('URL') and data.get('Title'):
-                results.append(data)
-                item_count_on_page += 1
+    The search page is backed by an XHR that returns the same item data as
+    JSON, so no browser render is needed. Returns a list of result dicts, or
+    None when the endpoint is unavailable or its payload shape is not
+    recognized (the caller then falls back to Selenium).
+    """
+    api_url = "https://www.newegg.com/product/api/ProductList"
+    params = {"d": search_term, "PageSize": page_size, "page": 1}
+    headers = {"Accept": "application/json", "Referer": "https://www.newegg.com/"}
+    try:
+        polite_delay()
+        response = _SESSION.get(api_url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        payload = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logging.warning(f"Newegg JSON endpoint unavailable ({e}); falling back to Selenium.")
+        return None
 
-        logging.info(f"Successfully parsed {item_count_on_page} valid items from Amazon page {page}.")
+    # The endpoint has shipped the item list under different keys over time;
+    # accept the first thing that looks like a list of products.
+    item_entries = []
+    if isinstance(payload, list):
+        item_entries = payload
+    elif isinstance(payload, dict):
+        for key in ("ProductLists", "ProductList", "SearchResult", "Items"):
+            value = payload.get(key)
+            if isinstance(value, dict):
+                value = value.get("Items") or value.get("ProductList")
+            if isinstance(value, list):
+                item_entries = value
+                break
+    if not item_entries:
+        logging.warning("Newegg JSON endpoint returned no recognizable item list; falling back to Selenium.")
+        return None
 
-    logging.info(f"Finished scraping Amazon. Found a total of {len(results)} valid items.")
+    results = []
+    for entry in item_entries:
+        if not isinstance(entry, dict): continue
+        description = entry.get("Description")
+        if not isinstance(description, dict): description = {}
+        title = description.get("Title") or entry.get("Title")
+        item_number = description.get("NeweggItemNumber") or entry.get("ItemNumber") or entry.get("Item")
+        price_info = entry.get("FinalPrice") or entry.get("Price")
+        if isinstance(price_info, dict):
+            price_info = price_info.get("CurrentPrice") or price_info.get("FinalPrice")
+        price = parse_price(str(price_info)) if price_info is not None else None
+        if not title or not item_number or price is None: continue
+        capacity = parse_capacity_tb(title)
+        if not capacity: continue
+        results.append({
+            'Retailer': 'Newegg',
+            'Title': title,
+            'URL': f"https://www.newegg.com/p/{item_number}",
+            'Price': price,
+            'Capacity (TB)': capacity,
+        })
+    if not results:
+        logging.warning("Newegg JSON endpoint yielded no valid items; falling back to Selenium.")
+        return None
+    logging.info(f"Newegg JSON endpoint returned {len(results)} valid items (no browser render needed).")
     return results
 
 
-def scrape_newegg(search_term, page_size=96):
-    """Scrapes Newegg search results using Selenium by requesting a larger page size."""
+def scrape_newegg(search_term, page_size=96, driver=None):
+    """Scrapes Newegg search results, preferring the JSON endpoint over Selenium.
+
+    The Selenium path renders a full page for ~10-30 s just to read the product
+    list, so it is kept only as a fallback. When it runs, it uses the supplied
+    driver if given (so several scrapes share one browser); otherwise it starts
+    and quits its own.
+    """
+    api_results = _scrape_newegg_api(search_term, page_size)
+    if api_results is not None:
+        return api_results
+
     logging.info(f"--- Scraping Newegg for '{search_term}' using Selenium (PageSize={page_size}) ---")
     results = []
     base_url = "https://www.newegg.com"
@@ -193,19 +536,10 @@ def scrape_newegg(search_term, page_size=96):
     url = f"{base_url}/p/pl?d={query}&PageSize={page_size}"
     logging.info(f"Requesting Newegg page via Selenium: {url}")
 
-    options = FirefoxOptions()
-    if 'User-Agent' in HEADERS: options.add_argument(f'user-agent={HEADERS["User-Agent"]}')
-    options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--window-size=1920,1080")
-
-    driver = None
-    service = None
+    own_driver = driver is None
     try:
-        os.environ['WDM_LOG_LEVEL'] = '0'
-        service = FirefoxService(GeckoDriverManager().install())
-        driver = webdriver.Firefox(service=service, options=options)
-        logging.info("Selenium Firefox driver initialized for Newegg.")
+        if own_driver:
+            driver = _new_firefox_driver()
 
         page_load_successful = False
         block_found = False
@@ -214,27 +548,16 @@ def scrape_newegg(search_term, page_size=96):
             driver.get(url)
             time.sleep(3)
 
-            current_page_source_lower = driver.page_source.lower()
+            page_source = _page_html(driver)
             blocking_keywords = ["captcha", "are you a human", "verify your identity", "challenge", "access denied", "forbidden", "page not found", "something went wrong"]
-            matched_keyword = None
-            soup_for_check = BeautifulSoup(driver.page_source, 'lxml')
-            for keyword in blocking_keywords:
-                if keyword in current_page_source_lower:
-                    h_tags = soup_for_check.select('h1, h2, h3, title')
-                    found_in_header = any(keyword in tag.get_text(strip=True).lower() for tag in h_tags)
-                    buttons = soup_for_check.select('button, input[type="submit"]')
-                    found_in_button = any(keyword in btn.get_text(strip=True).lower() or keyword in btn.get('value', '').lower() for btn in buttons)
-                    if found_in_header or found_in_button:
-                        logging.warning(f"Blocking keyword '{keyword}' detected prominently on Newegg page.")
-                        block_found = True
-                        matched_keyword = keyword
-                        break
-                    else: logging.debug(f"Keyword '{keyword}' found in Newegg source, but not prominently.")
+            matched_keyword = _detect_block(page_source, blocking_keywords)
+            block_found = matched_keyword is not None
 
             if block_found:
+                logging.warning(f"Blocking keyword '{matched_keyword}' detected prominently on Newegg page.")
                 try:
-                    blocked_html_path = os.path.join(os.getcwd(), f"newegg_blocked_{matched_keyword}_page_large.html")
-                    with open(blocked_html_path, "w", encoding="utf-8") as f: f.write(driver.page_source)
+                    blocked_html_path = Path.cwd() / f"newegg_blocked_{matched_keyword}_page_large.html"
+                    blocked_html_path.write_text(page_source, encoding="utf-8")
                     logging.info(f"Saved HTML source of suspected blocked Newegg page to: {blocked_html_path}")
                 except Exception as save_err: logging.error(f"Could not save blocked Newegg page HTML: {save_err}")
                 logging.warning("Stopping Newegg scrape due to detected prominent block.")
@@ -250,10 +573,11 @@ def scrape_newegg(search_term, page_size=96):
         except TimeoutException:
             logging.warning(f"Timeout ({wait_timeout}s) waiting for item cells ('div.item-cell') on Newegg large page.")
             try:
-                timeout_html_path = os.path.join(os.getcwd(), f"newegg_timeout_page_large.html")
-                with open(timeout_html_path, "w", encoding="utf-8") as f: f.write(driver.page_source)
+                timeout_page_html = _page_html(driver)
+                timeout_html_path = Path.cwd() / "newegg_timeout_page_large.html"
+                timeout_html_path.write_text(timeout_page_html, encoding="utf-8")
                 logging.info(f"Saved HTML source of timed-out Newegg page to: {timeout_html_path}")
-                page_text_lower = driver.page_source.lower()
+                page_text_lower = timeout_page_html.lower()
                 if "did not match any products" in page_text_lower or "we couldn't find any matches" in page_text_lower:
                      logging.warning(f"Newegg reported no results found for '{search_term}' after timeout.")
                 else: logging.warning("Timeout occurred without finding 'no results' message.")
@@ -263,9 +587,9 @@ def scrape_newegg(search_term, page_size=96):
 
         if page_load_successful: # Proceed only if page loaded successfully and wasn't blocked
             try:
-                page_source = driver.page_source
-                soup = BeautifulSoup(page_source, 'lxml')
-                items = soup.select('div.item-cell')
+                page_source = _page_html(driver)
+                soup = BeautifulSoup(page_source, 'lxml', parse_only=_NEWEGG_ITEM_STRAINER)
+                items = _NEWEGG_ITEM_SEL.select(soup)
                 logging.info(f"Found {len(items)} potential items on Newegg page using 'div.item-cell'.")
                 if not items: logging.warning("Items detected by wait, but not found by BeautifulSoup on Newegg page.")
                 else:
@@ -307,7 +631,7 @@ def scrape_newegg(search_term, page_size=96):
         logging.error(f"An unexpected error occurred during Newegg Selenium scraping: {general_error}", exc_info=True)
         return []
     finally:
-        if driver:
+        if own_driver and driver:
             try:
                 driver.quit()
                 logging.info("Selenium Firefox driver quit for Newegg.")
@@ -317,26 +641,21 @@ def scrape_newegg(search_term, page_size=96):
     return results
 
 
-def scrape_serverpartdeals(url):
-    """Scrapes ServerPartDeals collection page using Selenium."""
+def scrape_serverpartdeals(url, driver=None):
+    """Scrapes ServerPartDeals collection page using Selenium.
+
+    Uses the supplied driver when given (so several scrapes share one browser);
+    otherwise starts and quits its own.
+    """
     logging.info(f"--- Scraping ServerPartDeals using Selenium ---")
     logging.info(f"Requesting SPD page via Selenium: {url}")
     results = []
     base_url = "https://serverpartdeals.com"
 
-    options = FirefoxOptions()
-    if 'User-Agent' in HEADERS: options.add_argument(f'user-agent={HEADERS["User-Agent"]}')
-    options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--window-size=1920,1080")
-
-    driver = None
-    service = None
+    own_driver = driver is None
     try:
-        os.environ['WDM_LOG_LEVEL'] = '0'
-        service = FirefoxService(GeckoDriverManager().install())
-        driver = webdriver.Firefox(service=service, options=options)
-        logging.info("Selenium Firefox driver initialized for SPD.")
+        if own_driver:
+            driver = _new_firefox_driver()
 
         page_load_successful = False
         block_found = False
@@ -348,40 +667,44 @@ def scrape_serverpartdeals(url):
             time.sleep(static_sleep_duration)
 
             # Block Check
-            current_page_source_lower = driver.page_source.lower()
+            page_source = _page_html(driver)
             blocking_keywords = ["captcha", "verify", "challenge", "access denied", "forbidden"]
-            matched_keyword = None
-            soup_for_check = BeautifulSoup(driver.page_source, 'lxml')
-            for keyword in blocking_keywords:
-                if keyword in current_page_source_lower:
-                    h_tags = soup_for_check.select('h1, h2, h3, title')
-                    found_in_header = any(keyword in tag.get_text(strip=True).lower() for tag in h_tags)
-                    buttons = soup_for_check.select('button, input[type="submit"]')
-                    found_in_button = any(keyword in btn.get_text(strip=True).lower() or keyword in btn.get('value', '').lower() for btn in buttons)
-                    if found_in_header or found_in_button:
-                        logging.warning(f"Blocking keyword '{keyword}' detected prominently on SPD page.")
-                        block_found = True
-                        matched_keyword = keyword
-                        break
-                    else: logging.debug(f"Keyword '{keyword}' found in SPD source, but not prominently.")
+            matched_keyword = _detect_block(page_source, blocking_keywords)
+            block_found = matched_keyword is not None
 
             if block_found:
+                logging.warning(f"Blocking keyword '{matched_keyword}' detected prominently on SPD page.")
                 try:
-                    blocked_html_path = os.path.join(os.getcwd(), f"spd_blocked_{matched_keyword}_page.html")
-                    with open(blocked_html_path, "w", encoding="utf-8") as f: f.write(driver.page_source)
+                    blocked_html_path = Path.cwd() / f"spd_blocked_{matched_keyword}_page.html"
+                    blocked_html_path.write_text(page_source, encoding="utf-8")
                     logging.info(f"Saved HTML source of suspected blocked SPD page to: {blocked_html_path}")
                 except Exception as save_err: logging.error(f"Could not save blocked SPD page HTML: {save_err}")
                 logging.warning("Stopping SPD scrape due to detected prominent block.")
             else:
                 # Scroll and Wait for Inner Element Visibility
                 try:
-                    logging.debug("Scrolling down the SPD page...")
-                    for _ in range(3):
-                        driver.execute_script("window.scrollBy(0, document.body.scrollHeight * 0.6);")
-                        time.sleep(1.5)
+                    inner_item_selector_str = "a.boost-pfs-filter-product-item-title"
+                    # One async in-page script replaces the old 3x scrollBy +
+                    # 1.5 s sleep loop: it scrolls to the bottom and resolves as
+                    # soon as the item links render (or after its own 15 s cap),
+                    # so we pay one WebDriver RPC and no fixed sleeps.
+                    logging.debug("Scrolling SPD page via async script and waiting for item links...")
+                    driver.set_script_timeout(20)
+                    driver.execute_async_script("""
+                        var done = arguments[arguments.length - 1];
+                        var selector = arguments[0];
+                        var started = Date.now();
+                        var poll = setInterval(function () {
+                            window.scrollTo(0, document.body.scrollHeight);
+                            var el = document.querySelector(selector);
+                            if ((el && el.offsetParent !== null) || Date.now() - started > 15000) {
+                                clearInterval(poll);
+                                done();
+                            }
+                        }, 250);
+                    """, inner_item_selector_str)
 
                     wait_timeout = 60
-                    inner_item_selector_str = "a.boost-pfs-filter-product-item-title"
                     inner_item_selector = (By.CSS_SELECTOR, inner_item_selector_str)
                     logging.debug(f"Waiting up to {wait_timeout}s for VISIBILITY of SPD inner item element '{inner_item_selector[1]}'...")
                     WebDriverWait(driver, wait_timeout).until(EC.visibility_of_element_located(inner_item_selector))
@@ -391,8 +714,8 @@ def scrape_serverpartdeals(url):
                 except TimeoutException:
                     logging.warning(f"Timeout ({wait_timeout}s) waiting for VISIBILITY of inner item element ('{inner_item_selector_str}') on SPD page, even after scrolling.")
                     try:
-                        timeout_html_path = os.path.join(os.getcwd(), f"spd_timeout_page_inner_visibility.html")
-                        with open(timeout_html_path, "w", encoding="utf-8") as f: f.write(driver.page_source)
+                        timeout_html_path = Path.cwd() / "spd_timeout_page_inner_visibility.html"
+                        timeout_html_path.write_text(_page_html(driver), encoding="utf-8")
                         logging.info(f"Saved HTML source of timed-out (inner visibility) SPD page to: {timeout_html_path}")
                     except Exception as e: logging.error(f"Error checking/saving SPD page source after inner visibility timeout: {e}")
                 except WebDriverException as e: logging.error(f"Selenium WebDriverException occurred during scroll/wait for SPD page: {e}")
@@ -401,10 +724,10 @@ def scrape_serverpartdeals(url):
 
         if page_load_successful: # Proceed only if page loaded successfully and wasn't blocked
             try:
-                page_source = driver.page_source
-                soup = BeautifulSoup(page_source, 'lxml')
+                page_source = _page_html(driver)
+                soup = BeautifulSoup(page_source, 'lxml', parse_only=_SPD_ITEM_STRAINER)
                 item_container_selector = "div.boost-pfs-filter-product-item-inner"
-                items = soup.select(item_container_selector)
+                items = _SPD_ITEM_SEL.select(soup)
                 logging.info(f"Found {len(items)} potential items on SPD page using '{item_container_selector}'.")
                 if not items: logging.warning(f"Items visible by wait, but not found by BeautifulSoup('{item_container_selector}'). Parsing issue?")
                 else:
@@ -444,7 +767,7 @@ def scrape_serverpartdeals(url):
         logging.error(f"An unexpected error occurred during SPD Selenium scraping: {general_error}", exc_info=True)
         return []
     finally:
-        if driver:
+        if own_driver and driver:
             try:
                 driver.quit()
                 logging.info("Selenium Firefox driver quit for SPD.")
@@ -456,142 +779,19 @@ def scrape_serverpartdeals(url):
 
 # --- Main Execution ---
 
-if __name__ == "__main__":
-
-    start_time = datetime.datetime.now()
-    logging.info(f"Script started at: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-
-    all_results = []
-    scraper_status = {}
-
-    # Define URLs/Search Terms
-    amazon_search_term = SEARCH_TERM
-    newegg_search_term = SEARCH_TERM
-    serverpartdeals_url = "https://serverpartdeals.com/collections/manufacturer-recertified-drives"
-
-    # --- Define Output Path for the static HTML report ---
-    # Save to a 'pages' directory in the project root (or 'reports' as we discussed)
-    # For GitHub Pages, if your repo is 'my-repo', files in 'pages/' are at 'my-repo/pages/'
-    output_dir = 'pages'
-    os.makedirs(output_dir, exist_ok=True)
-    html_output_filename = os.path.join(output_dir, "hdd_prices_report.html")
-
-    # --- Run Scrapers ---
-    try:
-        amazon_results = scrape_amazon(amazon_search_term, max_pages=MAX_PAGES_PER_SITE)
-        all_results.extend(amazon_results)
-        scraper_status['Amazon'] = {"status": "Success", "count": len(amazon_results), "details": f"{MAX_PAGES_PER_SITE} page(s)"}
-    except Exception as e:
-        logging.error(f"Amazon scraper failed critically: {e}", exc_info=True)
-        scraper_status['Amazon'] = {"status": "Failed", "error": type(e).__name__}
-
-    try:
-        newegg_results = scrape_newegg(newegg_search_term, page_size=96)
-        all_results.extend(newegg_results)
-        scraper_status['Newegg'] = {"status": "Success", "count": len(newegg_results), "details": "1 large page"}
-    except Exception as e:
-        logging.error(f"Newegg scraper failed critically: {e}", exc_info=True)
-        scraper_status['Newegg'] = {"status": "Failed", "error": type(e).__name__}
-
-    try:
-        spd_results = scrape_serverpartdeals(serverpartdeals_url)
-        all_results.extend(spd_results)
-        scraper_status['ServerPartDeals'] = {"status": "Success", "count": len(spd_results), "details": "1 page"}
-    except Exception as e:
-        logging.error(f"ServerPartDeals scraper failed critically: {e}", exc_info=True)
-        scraper_status['ServerPartDeals'] = {"status": "Failed", "error": type(e).__name__}
-
-
-    end_time = datetime.datetime.now()
-    logging.info(f"All scraping finished at: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
-    try:
-        last_updated_str = end_time.astimezone().strftime('%Y-%m-%d %H:%M:%S %Z')
-    except ValueError:
-        last_updated_str = end_time.strftime('%Y-%m-%d %H:%M:%S')
-
-    # --- Prepare Status Message for HTML ---
-    status_lines_html = []
-    for site_name, site_data in scraper_status.items():
-        if site_data['status'] == 'Success':
-            details = f", {site_data.get('details', '')}" if site_data.get('details') else ''
-            status_lines_html.append(f"<li>{site_name}: {site_data['status']} ({site_data.get('count', 0)} items{details})</li>")
-        else:
-            status_lines_html.append(f"<li><strong style='color: var(--error-text, #cc0000);'>{site_name}: {site_data['status']}</strong> (Error: {site_data.get('error', 'Unknown')})</li>")
-
-    status_html_for_report = f"<ul>{''.join(status_lines_html)}</ul>"
-    status_note_html = ""
-    if 'Failed' in [s_data['status'] for s_data in scraper_status.values()]:
-         status_note_html = "<p style='color: orange; text-align: center; font-size: 0.9em;'>Note: One or more scrapers failed. Results may be incomplete. Check console logs for details.</p>"
-
-    # --- Process Combined Data for JavaScript and Initial HTML Table ---
-    no_data_message_html = ""
-    table_html_body_rows = "" # For initial render by Python
-    js_data_json_string = "[]" # Default to empty array
-
-    if not all_results:
-        logging.warning("\nNo valid hard drive data found from ANY retailer after parsing.")
-        no_data_message_html = f"""
-        <div class="error-container">
-            <p class="error">No valid hard drive data found from any retailer after parsing.</p>
-            <p class="error-detail">Please check the script's console output for potential errors.</p>
-        </div>
-        """
-    else:
-        df = pd.DataFrame(all_results)
-        df['Price per TB ($)'] = df.apply(
-            lambda row: round(row['Price'] / row['Capacity (TB)'], 2) if pd.notna(row.get('Capacity (TB)')) and row['Capacity (TB)'] > 0 and pd.notna(row.get('Price')) else None,
-            axis=1
-        )
-        df.dropna(subset=['Price per TB ($)', 'Capacity (TB)', 'Price', 'Title', 'URL', 'Retailer'], inplace=True)
-        df_sorted = df.sort_values(by=['Price per TB ($)', 'Retailer'], ascending=True).reset_index(drop=True)
-
-        if df_sorted.empty:
-             no_data_message_html = f"""
-             <div class="error-container">
-                 <p class="error">No drives found after filtering and calculation.</p>
-            </div>
-            """
-        else:
-            js_data_df = df_sorted[['Retailer', 'Title', 'URL', 'Capacity (TB)', 'Price', 'Price per TB ($)']].copy()
-            js_data_df.rename(columns={
-                'Capacity (TB)': 'Capacity_TB',
-                'Price per TB ($)': 'Price_per_TB'
-            }, inplace=True)
-            js_data_list = js_data_df.to_dict(orient='records')
-            js_data_json_string = json.dumps(js_data_list)
-
-            rows_html_list = []
-            for index, row_data in df_sorted.iterrows():
-                rows_html_list.append(f"""
-                <tr>
-                    <td class="text-center">{index + 1}</td>
-                    <td>{row_data['Retailer']}</td>
-                    <td>{create_html_link(row_data['Title'], row_data['URL'])}</td>
-                    <td class="text-right">{row_data['Capacity (TB)']}</td>
-                    <td class="text-right">${row_data['Price']:,.2f}</td>
-                    <td class="text-right">${row_data['Price per TB ($)']:,.2f}</td>
-                </tr>""")
-            table_html_body_rows = "".join(rows_html_list)
-
-
-    # --- Construct Full HTML Page ---
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>HDD Price per TB (Sortable & Filterable)</title>
-    <style>
-        /* --- CSS Variables --- */
-        :root {{
+# Static report assets, written verbatim (single braces) to sibling files so
+# browsers cache them across regenerations; only the thin HTML scaffold is
+# rebuilt per run.
+_REPORT_CSS = """        /* --- CSS Variables --- */
+        :root {
             --bg-color: #ffffff; --text-color: #333333; --link-color: #007bff;
             --border-color: #dddddd; --header-bg-color: #f8f8f8; --hover-bg-color: #f1f1f1;
             --subtle-text-color: #555555; --button-bg: #eee; --button-text: #333;
             --button-border: #ccc; --active-button-bg: #007bff; --active-button-text: white;
             --status-border: #ddd; --status-bg: #f9f9f9;
             --error-border: #e57373; --error-bg: #ffebee; --error-text: #c62828;
-        }}
-        body.dark-mode {{
+        }
+        body.dark-mode {
             --bg-color: #121212; --text-color: #e0e0e0; --link-color: rgb(138, 180, 248); /* From user */
             --border-color: rgb(44, 45, 45); /* From user --main-border-color */
             --header-bg-color: #292929; /* From user --card-header-bg */
@@ -603,56 +803,338 @@ if __name__ == "__main__":
             /* Dark mode table specific (using user provided values) */
             --table-bg-dark-odd: rgb(31, 31, 34);    /* --tb-odd-bg */
             --table-bg-dark-even: rgb(27, 27, 30);   /* --tb-even-bg */
-        }}
+        }
         /* --- General Styles --- */
-        body {{ font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; margin: 0; padding: 20px; line-height: 1.6; background-color: var(--bg-color); color: var(--text-color); transition: background-color 0.3s, color 0.3s; display: flex; flex-direction: column; min-height: 100vh; }}
-        .container {{ max-width: 1000px; margin: 0 auto; width: 100%; flex-grow: 1; }}
-        header {{ display: flex; justify-content: space-between; align-items: center; border-bottom: 1px solid var(--border-color); padding-bottom: 10px; margin-bottom: 20px; flex-wrap: wrap; }}
-        .header-main-content {{ flex-grow: 1; text-align: center; }}
-        h1 {{ margin: 0; font-size: 1.8em; }}
-        .subtitle, .timestamp {{ color: var(--subtle-text-color); font-size: 0.9em; margin-top: 2px; width: 100%; }}
-        .timestamp {{ margin-bottom: 0; }}
-        .header-back-link {{ margin-right: auto; font-size: 0.9em; padding: 8px 0; }}
-        .header-back-link a {{ color: var(--link-color); text-decoration: none; }}
-        .header-back-link a:hover {{ text-decoration: underline; }}
-        #themeToggle {{ padding: 8px 12px; background-color: var(--button-bg); color: var(--button-text); border: 1px solid var(--button-border); border-radius: 5px; cursor: pointer; font-size: 0.9em; transition: background-color 0.2s, border-color 0.2s; }}
+        body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; margin: 0; padding: 20px; line-height: 1.6; background-color: var(--bg-color); color: var(--text-color); transition: background-color 0.3s, color 0.3s; display: flex; flex-direction: column; min-height: 100vh; }
+        .container { max-width: 1000px; margin: 0 auto; width: 100%; flex-grow: 1; }
+        header { display: flex; justify-content: space-between; align-items: center; border-bottom: 1px solid var(--border-color); padding-bottom: 10px; margin-bottom: 20px; flex-wrap: wrap; }
+        .header-main-content { flex-grow: 1; text-align: center; }
+        h1 { margin: 0; font-size: 1.8em; }
+        .subtitle, .timestamp { color: var(--subtle-text-color); font-size: 0.9em; margin-top: 2px; width: 100%; }
+        .timestamp { margin-bottom: 0; }
+        .header-back-link { margin-right: auto; font-size: 0.9em; padding: 8px 0; }
+        .header-back-link a { color: var(--link-color); text-decoration: none; }
+        .header-back-link a:hover { text-decoration: underline; }
+        #themeToggle { padding: 8px 12px; background-color: var(--button-bg); color: var(--button-text); border: 1px solid var(--button-border); border-radius: 5px; cursor: pointer; font-size: 0.9em; transition: background-color 0.2s, border-color 0.2s; }
         /* --- Status & Controls --- */
-        .status-section, .controls-container {{ background-color: var(--status-bg); border: 1px solid var(--status-border); padding: 10px 15px; margin-bottom: 20px; border-radius: 5px; font-size: 0.9em; }}
-        .status-section h3, .controls-container h4 {{ margin-top:0; margin-bottom: 8px; font-size: 1.1em; }}
-        .status-section ul {{ margin: 0 0 5px 20px; padding: 0; list-style-type: disc; }}
-        .status-section li {{ margin-bottom: 4px; }}
-        .controls-container button {{ padding: 5px 10px; margin-right: 5px; margin-bottom: 5px; background-color: var(--button-bg); color: var(--button-text); border: 1px solid var(--button-border); border-radius: 3px; cursor: pointer; }}
-        .controls-container button.active-sort {{ background-color: var(--active-button-bg); color: var(--active-button-text); border-color: var(--active-button-bg); }}
-        .filter-group label {{ margin-right: 15px; display: inline-block; cursor:pointer; }}
-        .filter-group input[type="checkbox"] {{ margin-right: 5px; vertical-align: middle; }}
+        .status-section, .controls-container { background-color: var(--status-bg); border: 1px solid var(--status-border); padding: 10px 15px; margin-bottom: 20px; border-radius: 5px; font-size: 0.9em; }
+        .status-section h3, .controls-container h4 { margin-top:0; margin-bottom: 8px; font-size: 1.1em; }
+        .status-section ul { margin: 0 0 5px 20px; padding: 0; list-style-type: disc; }
+        .status-section li { margin-bottom: 4px; }
+        .controls-container button { padding: 5px 10px; margin-right: 5px; margin-bottom: 5px; background-color: var(--button-bg); color: var(--button-text); border: 1px solid var(--button-border); border-radius: 3px; cursor: pointer; }
+        .controls-container button.active-sort { background-color: var(--active-button-bg); color: var(--active-button-text); border-color: var(--active-button-bg); }
+        .filter-group label { margin-right: 15px; display: inline-block; cursor:pointer; }
+        .filter-group input[type="checkbox"] { margin-right: 5px; vertical-align: middle; }
         /* --- Table Styles --- */
-        .table-responsive {{ overflow-x: auto; }}
-        .results-table {{ width: 100%; border-collapse: collapse; margin: 20px 0; font-size: 0.95em; border: 1px solid var(--border-color); }}
-        .results-table th, .results-table td {{ border: 1px solid var(--border-color); padding: 10px 8px; text-align: left; vertical-align: top; }}
-        .results-table th {{ background-color: var(--header-bg-color); font-weight: bold; text-align: center; cursor: pointer; }}
-        .results-table th:hover {{ background-color: var(--hover-bg-color); }}
-        .results-table td:nth-child(1), .results-table th:nth-child(1) {{ width: 3em; text-align: center; }}
-        .results-table td:nth-child(2), .results-table th:nth-child(2) {{ width: 100px; white-space: nowrap; }}
-        .results-table td:nth-child(3), .results-table th:nth-child(3) {{ min-width: 200px; max-width: 350px; word-break: break-word; white-space: normal !important; }}
-        .results-table td:nth-child(4), .results-table th:nth-child(4) {{ width: 80px; text-align: right; }}
-        .results-table td:nth-child(5), .results-table th:nth-child(5) {{ width: 90px; text-align: right; }}
-        .results-table td:nth-child(6), .results-table th:nth-child(6) {{ width: 80px; text-align: right; }}
-        .results-table a {{ color: var(--link-color); text-decoration: none; }}
-        .results-table a:hover {{ text-decoration: underline; }}
-        .results-table tbody tr:hover > * {{ background-color: var(--hover-bg-color); }}
+        .table-responsive { overflow-x: auto; }
+        .results-table { width: 100%; border-collapse: collapse; margin: 20px 0; font-size: 0.95em; border: 1px solid var(--border-color); }
+        .results-table th, .results-table td { border: 1px solid var(--border-color); padding: 10px 8px; text-align: left; vertical-align: top; }
+        .results-table th { background-color: var(--header-bg-color); font-weight: bold; text-align: center; cursor: pointer; }
+        .results-table th:hover { background-color: var(--hover-bg-color); }
+        .results-table td:nth-child(1), .results-table th:nth-child(1) { width: 3em; text-align: center; }
+        .results-table td:nth-child(2), .results-table th:nth-child(2) { width: 100px; white-space: nowrap; }
+        .results-table td:nth-child(3), .results-table th:nth-child(3) { min-width: 200px; max-width: 350px; word-break: break-word; white-space: normal !important; }
+        .results-table td:nth-child(4), .results-table th:nth-child(4) { width: 80px; text-align: right; }
+        .results-table td:nth-child(5), .results-table th:nth-child(5) { width: 90px; text-align: right; }
+        .results-table td:nth-child(6), .results-table th:nth-child(6) { width: 80px; text-align: right; }
+        .results-table a { color: var(--link-color); text-decoration: none; }
+        .results-table a:hover { text-decoration: underline; }
+        .results-table tbody tr:hover > * { background-color: var(--hover-bg-color); }
         /* Dark Mode Table Specifics */
-        [data-theme="dark"] .results-table {{ color: var(--text-color); border-color: var(--border-color); }}
-        [data-theme="dark"] .results-table th {{ background-color: var(--header-bg-color); border-color: var(--border-color); }}
-        [data-theme="dark"] .results-table.table-striped > tbody > tr:nth-of-type(odd) > * {{ background-color: var(--table-bg-dark-odd); color: var(--text-color); }}
-        [data-theme="dark"] .results-table.table-striped > tbody > tr:nth-of-type(even) > * {{ background-color: var(--table-bg-dark-even); color: var(--text-color); }}
-        [data-theme="dark"] .results-table tbody tr:hover > * {{ background-color: var(--hover-bg-color); }}
+        [data-theme="dark"] .results-table { color: var(--text-color); border-color: var(--border-color); }
+        [data-theme="dark"] .results-table th { background-color: var(--header-bg-color); border-color: var(--border-color); }
+        /* Striping classes are assigned at row construction: unlike
+           :nth-of-type, a class match never forces the style engine to
+           renumber every later sibling when rows are swapped in/out, and
+           stripes stay correct around the virtual-scroll spacer rows. */
+        [data-theme="dark"] .results-table.table-striped > tbody > tr.row-odd > * { background-color: var(--table-bg-dark-odd); color: var(--text-color); }
+        [data-theme="dark"] .results-table.table-striped > tbody > tr.row-even > * { background-color: var(--table-bg-dark-even); color: var(--text-color); }
+        [data-theme="dark"] .results-table tbody tr:hover > * { background-color: var(--hover-bg-color); }
         /* Error Message */
-        .error-container {{ text-align: center; margin-top: 40px; padding: 20px; border: 1px solid var(--error-border); background-color: var(--error-bg); color: var(--error-text); border-radius: 5px; }}
-        .error {{ font-weight: bold; margin-bottom: 5px; }}
-        .error-detail {{ font-size: 0.9em; }}
+        .error-container { text-align: center; margin-top: 40px; padding: 20px; border: 1px solid var(--error-border); background-color: var(--error-bg); color: var(--error-text); border-radius: 5px; }
+        .error { font-weight: bold; margin-bottom: 5px; }
+        .error-detail { font-size: 0.9em; }
         /* Responsive */
-        @media (max-width: 768px) {{ body {{ padding: 10px; }} header {{ justify-content: center; }} #themeToggle {{ margin-top: 10px; margin-left:0; }} h1 {{ font-size: 1.5em; }} .results-table th, .results-table td {{ padding: 6px 4px; font-size: 0.85em; }} }}
-    </style>
+        @media (max-width: 768px) { body { padding: 10px; } header { justify-content: center; } #themeToggle { margin-top: 10px; margin-left:0; } h1 { font-size: 1.5em; } .results-table th, .results-table td { padding: 6px 4px; font-size: 0.85em; } }
+"""
+
+_REPORT_JS = """        const toggleButton = document.getElementById('themeToggle');
+        const body = document.body;
+        const currentTheme = localStorage.getItem('theme');
+        const prefersDarkScheme = window.matchMedia('(prefers-color-scheme: dark)');
+        function applyTheme(theme) {
+            if (theme === 'dark') { body.classList.add('dark-mode'); toggleButton.textContent = 'Switch to Light Mode'; localStorage.setItem('theme', 'dark'); }
+            else { body.classList.remove('dark-mode'); toggleButton.textContent = 'Switch to Dark Mode'; localStorage.setItem('theme', 'light'); }
+        }
+        if (currentTheme) { applyTheme(currentTheme); }
+        else if (prefersDarkScheme.matches) { applyTheme('dark'); }
+        else { applyTheme('light'); }
+        toggleButton.addEventListener('click', () => { applyTheme(body.classList.contains('dark-mode') ? 'light' : 'dark'); });
+        prefersDarkScheme.addEventListener('change', (e) => { if (!localStorage.getItem('theme')) { applyTheme(e.matches ? 'dark' : 'light'); } });
+
+      // The drive data ships as an inert application/json block: the browser
+      // never runs it through the JS parser mid-document, and JSON.parse's
+      // native fast path handles large payloads quicker than a JS literal.
+      // The payload is columnar (one array per field, no repeated keys on the
+      // wire); row objects are materialized once here, with the pre-coerced
+      // sort fields built in the same pass.
+      const _cols = JSON.parse(document.getElementById('drive-data').textContent);
+      const _rowCount = (_cols.Retailer || []).length;
+      const rawDriveData = new Array(_rowCount);
+      for (let i = 0; i < _rowCount; i++) {
+          rawDriveData[i] = {
+              Retailer: _cols.Retailer[i],
+              Title: _cols.Title[i],
+              URL: _cols.URL[i],
+              Capacity_TB: _cols.Capacity_TB[i],
+              Price: _cols.Price[i],
+              Price_per_TB: _cols.Price_per_TB[i],
+              _sort_Retailer: _cols.Retailer[i].toLowerCase(),
+              _sort_Title: _cols.Title[i].toLowerCase(),
+              _sort_Capacity_TB: +_cols.Capacity_TB[i],
+              _sort_Price: +_cols.Price[i],
+              _sort_Price_per_TB: +_cols.Price_per_TB[i],
+          };
+      }
+
+      let currentSortKey = 'Price_per_TB';
+      let currentSortDirection = 'asc';
+      let currentFilters = { retailer: [] }; // Initialize with empty array for retailers
+
+      const tableBody = document.querySelector('.results-table tbody');
+      const sortButtons = document.querySelectorAll('.sort-btn'); // Now includes THs
+      const retailerFiltersContainer = document.getElementById('retailerFilters');
+      const currentSortIndicator = document.getElementById('currentSortIndicator');
+
+      // One comparator per sort key, built once over the pre-coerced fields:
+      // numeric keys subtract, string keys three-way compare. This keeps the
+      // key dispatch and type checks out of every comparison.
+      const COMPARATORS = {
+          Retailer: (a, b) => a._sort_Retailer < b._sort_Retailer ? -1 : a._sort_Retailer > b._sort_Retailer ? 1 : 0,
+          Title: (a, b) => a._sort_Title < b._sort_Title ? -1 : a._sort_Title > b._sort_Title ? 1 : 0,
+          Capacity_TB: (a, b) => a._sort_Capacity_TB - b._sort_Capacity_TB,
+          Price: (a, b) => a._sort_Price - b._sort_Price,
+          Price_per_TB: (a, b) => a._sort_Price_per_TB - b._sort_Price_per_TB,
+      };
+
+      // Lazily memoized row orderings: the data is sorted once per
+      // (key, direction) ever requested, so repeat clicks and filter-only
+      // changes become a linear walk of a pre-sorted index array instead of
+      // a fresh O(n log n) sort of the filtered set.
+      const _sortedIndices = {};
+      function sortedIndicesFor(key, direction) {
+          const memoKey = key + '_' + direction;
+          let indices = _sortedIndices[memoKey];
+          if (!indices) {
+              let asc = _sortedIndices[key + '_asc'];
+              if (!asc) {
+                  const cmp = COMPARATORS[key];
+                  asc = [...rawDriveData.keys()].sort((i, j) => cmp(rawDriveData[i], rawDriveData[j]));
+                  _sortedIndices[key + '_asc'] = asc;
+              }
+              indices = direction === 'asc' ? asc : asc.slice().reverse();
+              _sortedIndices[memoKey] = indices;
+          }
+          return indices;
+      }
+
+      function populateRetailerFilters() {
+          const retailers = [...new Set(rawDriveData.map(item => item.Retailer))].sort();
+          retailers.forEach(retailer => {
+              const label = document.createElement('label');
+              const checkbox = document.createElement('input');
+              checkbox.type = 'checkbox';
+              checkbox.value = retailer;
+              checkbox.dataset.retailer = retailer; // For easier selection
+              checkbox.checked = true;
+              label.appendChild(checkbox);
+              label.appendChild(document.createTextNode(` ${retailer}`));
+              retailerFiltersContainer.appendChild(label);
+          });
+          currentFilters.retailer = retailers; // Start with all selected
+      }
+
+      // Above this many rows the tbody is windowed: only the slice near the
+      // viewport is materialized, with spacer rows preserving scrollbar
+      // geometry, so the DOM stays viewport-sized however big the result set.
+      const VIRTUAL_THRESHOLD = 300;
+      const OVERSCAN = 20;
+
+      // Hoisted currency formatters: native formatting per cell instead of a
+      // per-row parseFloat + lookahead-regex thousands insertion. $/TB keeps
+      // its historical ungrouped form.
+      const USD = new Intl.NumberFormat('en-US', { style: 'currency', currency: 'USD' });
+      const USD_NO_GROUP = new Intl.NumberFormat('en-US', { style: 'currency', currency: 'USD', useGrouping: false });
+      let displayedData = [];
+      let rowHeight = 41; // estimate; refined from a real row after each windowed render
+
+      // Rows are built as one HTML string and assigned to tbody.innerHTML in
+      // a single call: the document parser materializes every row in one
+      // native pass instead of ~6 JS→DOM calls per row. Scraped text is
+      // escaped through esc() on the way into the markup.
+      const esc = s => String(s).replace(/[&<>"']/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c]));
+      const MAX_TITLE_LENGTH = 100;
+
+      function rowHtml(item, index) {
+          const shown = item.Title.length > MAX_TITLE_LENGTH ? item.Title.substring(0, MAX_TITLE_LENGTH - 3) + '...' : item.Title;
+          return `<tr class="${(index & 1) ? 'row-even' : 'row-odd'}">` +
+              `<td>${index + 1}</td>` +
+              `<td>${esc(item.Retailer)}</td>` +
+              `<td><a href="${esc(item.URL)}" target="_blank" rel="noopener noreferrer" title="${esc(item.Title)}">${esc(shown)}</a></td>` +
+              `<td>${item.Capacity_TB}</td>` +
+              `<td>${USD.format(item._sort_Price)}</td>` +
+              `<td>${USD_NO_GROUP.format(item._sort_Price_per_TB)}</td></tr>`;
+      }
+
+      function renderTable(dataToRender) {
+          displayedData = dataToRender || [];
+          renderWindow();
+      }
+
+      function renderWindow() {
+          if (displayedData.length === 0) {
+              tableBody.innerHTML = '<tr><td colspan="6" style="text-align: center; padding: 20px;">No matching drives found.</td></tr>';
+              return;
+          }
+          if (displayedData.length <= VIRTUAL_THRESHOLD) {
+              tableBody.innerHTML = displayedData.map(rowHtml).join('');
+              return;
+          }
+          const table = tableBody.closest('table');
+          const tableTop = table.getBoundingClientRect().top + window.scrollY;
+          const firstIdx = Math.max(0, Math.floor((window.scrollY - tableTop) / rowHeight) - OVERSCAN);
+          const count = Math.ceil(window.innerHeight / rowHeight) + 2 * OVERSCAN;
+          const slice = displayedData.slice(firstIdx, firstIdx + count);
+
+          const parts = [`<tr style="height: ${firstIdx * rowHeight}px;"></tr>`];
+          for (let i = 0; i < slice.length; i++) parts.push(rowHtml(slice[i], firstIdx + i));
+          parts.push(`<tr style="height: ${(displayedData.length - firstIdx - slice.length) * rowHeight}px;"></tr>`);
+          tableBody.innerHTML = parts.join('');
+
+          if (slice.length > 0 && tableBody.rows.length > 2) {
+              const measured = tableBody.rows[1].offsetHeight;
+              if (measured > 0) rowHeight = measured;
+          }
+      }
+
+      // Coalesce event bursts (rapid checkbox toggles, scroll streams) to at
+      // most one filter+sort+render per animation frame.
+      let _filterRaf = 0;
+      function scheduleRender() {
+          if (_filterRaf) return;
+          _filterRaf = requestAnimationFrame(() => { _filterRaf = 0; applyFiltersAndRender(); });
+      }
+
+      let _scrollRaf = 0;
+      window.addEventListener('scroll', () => {
+          if (_scrollRaf || displayedData.length <= VIRTUAL_THRESHOLD) return;
+          _scrollRaf = requestAnimationFrame(() => { _scrollRaf = 0; renderWindow(); });
+      }, { passive: true });
+
+      function updateSortIndicator() {
+          const directionArrow = currentSortDirection === 'asc' ? '▲' : '▼';
+          let columnText = currentSortKey;
+          // Make column text more user-friendly
+          const columnMap = {
+              'Retailer': 'Retailer', 'Title': 'Product', 'Capacity_TB': 'Size (TB)',
+              'Price': 'Price', 'Price_per_TB': '$/TB', '#': '#'
+          };
+          columnText = columnMap[currentSortKey] || currentSortKey;
+          currentSortIndicator.textContent = `Sorted by: ${columnText} ${directionArrow}`;
+          
+          sortButtons.forEach(button => {
+              button.classList.remove('active-sort');
+              if (button.dataset.sortKey === currentSortKey) {
+                  button.classList.add('active-sort');
+              }
+          });
+      }
+
+      function applyFiltersAndRender() {
+          // 1. Get selected retailers
+          const selectedRetailers = Array.from(retailerFiltersContainer.querySelectorAll('input[type="checkbox"]:checked'))
+                                     .map(cb => cb.value);
+          currentFilters.retailer = selectedRetailers;
+
+          // 2+3. Walk the memoized sort order and keep the rows that pass the
+          // retailer Set test: the output arrives already sorted, so a filter
+          // toggle costs one linear pass, not a re-sort.
+          const retailerSet = new Set(currentFilters.retailer);
+          const order = sortedIndicesFor(currentSortKey, currentSortDirection);
+          const filteredData = [];
+          for (const idx of order) {
+              const item = rawDriveData[idx];
+              if (retailerSet.size === 0 || retailerSet.has(item.Retailer)) filteredData.push(item);
+          }
+
+          // 4. Render the table with this filtered and sorted data
+          renderTable(filteredData);
+          updateSortIndicator();
+      }
+
+      // Delegated listeners: one click handler catches every .sort-btn
+      // (header cells and control buttons alike) as the event bubbles, and
+      // checkbox changes bubble to the filter container — no per-element
+      // listener allocations at startup, and none to rewire if the filter
+      // checkboxes are ever rebuilt.
+      document.addEventListener('click', (e) => {
+          const button = e.target.closest('.sort-btn');
+          if (!button) return;
+          const sortByKey = button.dataset.sortKey;
+          if (sortByKey === '#') return; // Don't sort by rank
+
+          if (currentSortKey === sortByKey) {
+              currentSortDirection = currentSortDirection === 'asc' ? 'desc' : 'asc';
+          } else {
+              currentSortKey = sortByKey;
+              currentSortDirection = 'asc';
+          }
+          applyFiltersAndRender();
+      });
+      retailerFiltersContainer.addEventListener('change', scheduleRender);
+
+      // Initial Setup
+      if (rawDriveData && rawDriveData.length > 0) {
+          populateRetailerFilters();
+          applyFiltersAndRender(); // Initial render
+      } else {
+          renderTable([]); // Render "no data" message
+          // Optionally disable controls if no data
+          document.querySelector('.controls-container').style.display = 'none';
+      }
+"""
+
+def _write_static_asset(path, content):
+    """Writes a static asset only when its content actually changed.
+
+    On a scheduled regeneration the CSS/JS are identical run to run, so the
+    files (and their mtimes) stay untouched and browsers keep serving their
+    cached copies. The short content hash feeds the ?v= cache-busting query,
+    so an asset edit still reaches clients immediately.
+    """
+    data = content.encode('utf-8')
+    digest = hashlib.blake2b(data, digest_size=4).hexdigest()
+    try:
+        if path.read_bytes() == data:
+            return digest
+    except OSError:
+        pass
+    path.write_bytes(data)
+    return digest
+
+# --- Report Template ---
+# The report scaffold is ~95% static CSS/JS; keeping it in plain module-level
+# constants means the literal is built once at import and each render only
+# fills the handful of named .format placeholders. string.Template would let
+# the doubled CSS/JS braces be written singly, but the embedded JS uses
+# `${...}` template literals, which collide with Template's own delimiter.
+_REPORT_PROLOGUE_TMPL = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>HDD Price per TB (Sortable & Filterable)</title>
+    <link rel="stylesheet" href="style.css?v={css_hash}">
 </head>
 <body>
     <div class="container">
@@ -686,6 +1168,7 @@ if __name__ == "__main__":
         </div>
 
         {no_data_message_html}
+        <noscript><p style="text-align: center;">This report renders its table with JavaScript; please enable it to see the results.</p></noscript>
         <div class="table-responsive">
             <table class="results-table table-striped">
                 <thead>
@@ -698,216 +1181,200 @@ if __name__ == "__main__":
                         <th class="sort-btn" data-sort-key="Price_per_TB">$/TB</th>
                     </tr>
                 </thead>
-                <tbody>
-                    {table_html_body_rows}
+                <tbody>"""
+
+_REPORT_EPILOGUE_TMPL = """
                 </tbody>
             </table>
         </div>
         {status_note_html}
     </div>
-    <script>
-        const toggleButton = document.getElementById('themeToggle');
-        const body = document.body;
-        const currentTheme = localStorage.getItem('theme');
-        const prefersDarkScheme = window.matchMedia('(prefers-color-scheme: dark)');
-        function applyTheme(theme) {{
-            if (theme === 'dark') {{ body.classList.add('dark-mode'); toggleButton.textContent = 'Switch to Light Mode'; localStorage.setItem('theme', 'dark'); }}
-            else {{ body.classList.remove('dark-mode'); toggleButton.textContent = 'Switch to Dark Mode'; localStorage.setItem('theme', 'light'); }}
-        }}
-        if (currentTheme) {{ applyTheme(currentTheme); }}
-        else if (prefersDarkScheme.matches) {{ applyTheme('dark'); }}
-        else {{ applyTheme('light'); }}
-        toggleButton.addEventListener('click', () => {{ applyTheme(body.classList.contains('dark-mode') ? 'light' : 'dark'); }});
-        prefersDarkScheme.addEventListener('change', (e) => {{ if (!localStorage.getItem('theme')) {{ applyTheme(e.matches ? 'dark' : 'light'); }} }});
-    </script>
-    <script>
-      // --- EMBED THE JAVASCRIPT FOR SORTING/FILTERING HERE ---
-      // --- This is the full JS block from the previous correct answer ---
-      const rawDriveData = {js_data_json_string};
-      let currentSortKey = 'Price_per_TB';
-      let currentSortDirection = 'asc';
-      let currentFilters = {{ retailer: [] }}; // Initialize with empty array for retailers
+    <script id="drive-data" type="application/json">{js_data_json_string}</script>
+    <script src="app.js?v={js_hash}" defer></script>
+</body>
+</html>"""
 
-      const tableBody = document.querySelector('.results-table tbody');
-      const sortButtons = document.querySelectorAll('.sort-btn'); // Now includes THs
-      const retailerFiltersContainer = document.getElementById('retailerFilters');
-      const currentSortIndicator = document.getElementById('currentSortIndicator');
+if __name__ == "__main__":
 
-      function populateRetailerFilters() {{
-          const retailers = [...new Set(rawDriveData.map(item => item.Retailer))].sort();
-          retailers.forEach(retailer => {{
-              const label = document.createElement('label');
-              const checkbox = document.createElement('input');
-              checkbox.type = 'checkbox';
-              checkbox.value = retailer;
-              checkbox.dataset.retailer = retailer; // For easier selection
-              checkbox.checked = true;
-              checkbox.addEventListener('change', applyFiltersAndRender);
-              label.appendChild(checkbox);
-              label.appendChild(document.createTextNode(` ${{retailer}}`));
-              retailerFiltersContainer.appendChild(label);
-          }});
-          currentFilters.retailer = retailers; // Start with all selected
-      }}
-
-      function renderTable(dataToRender) {{
-          tableBody.innerHTML = '';
-          if (!dataToRender || dataToRender.length === 0) {{
-              const row = tableBody.insertRow();
-              const cell = row.insertCell();
-              cell.colSpan = 6;
-              cell.textContent = 'No matching drives found.';
-              cell.style.textAlign = 'center';
-              cell.style.padding = '20px';
-              return;
-          }}
-          dataToRender.forEach((item, index) => {{
-              const row = tableBody.insertRow();
-              row.insertCell().textContent = index + 1;
-              row.insertCell().textContent = item.Retailer;
-              const productCell = row.insertCell();
-              const link = document.createElement('a');
-              link.href = item.URL;
-              // Truncate title for display - adjust length as needed
-              const maxTitleLength = 100;
-              link.textContent = item.Title.length > maxTitleLength ? item.Title.substring(0, maxTitleLength - 3) + "..." : item.Title;
-              link.title = item.Title; // Full title on hover
-              link.target = '_blank';
-              link.rel = 'noopener noreferrer';
-              productCell.appendChild(link);
-              row.insertCell().textContent = item.Capacity_TB;
-              row.insertCell().textContent = `$${{parseFloat(item.Price).toFixed(2).replace(/\\B(?=(\\d{{3}})+(?!\\d))/g, ",") }}`;
-              row.insertCell().textContent = `$${{parseFloat(item.Price_per_TB).toFixed(2)}}`;
-
-              row.cells[0].style.textAlign = 'center';
-              row.cells[3].style.textAlign = 'right';
-              row.cells[4].style.textAlign = 'right';
-              row.cells[5].style.textAlign = 'right';
-          }});
-      }}
-
-      function sortData(key, direction) {{
-          // Get the currently displayed data (which might already be filtered)
-          // Sorting should operate on the 'displayedData' array which is managed by applyFiltersAndRender
-          // The global 'displayedData' will be sorted in place by this function.
-          // It's reassigned in applyFilters() before sortData() is called.
-
-          let dataToSort = JSON.parse(JSON.stringify(rawDriveData)); // Start with a fresh copy of raw data for filtering
-          
-          // Apply current filters to this fresh data
-          if (currentFilters.retailer && currentFilters.retailer.length > 0) {{
-              dataToSort = dataToSort.filter(item => currentFilters.retailer.includes(item.Retailer));
-          }}
-          // Add other filters here if they exist in currentFilters
-
-          dataToSort.sort((a, b) => {{
-              let valA = a[key];
-              let valB = b[key];
-              if (key === 'Price' || key === 'Capacity_TB' || key === 'Price_per_TB') {{
-                  valA = parseFloat(valA);
-                  valB = parseFloat(valB);
-              }} else if (typeof valA === 'string') {{
-                  valA = valA.toLowerCase();
-                  valB = valB.toLowerCase();
-              }}
-              if (valA < valB) return direction === 'asc' ? -1 : 1;
-              if (valA > valB) return direction === 'asc' ? 1 : -1;
-              return 0;
-          }});
-          return dataToSort; // Return the sorted (and filtered) data
-      }}
-      
-      function updateSortIndicator() {{
-          const directionArrow = currentSortDirection === 'asc' ? '▲' : '▼';
-          let columnText = currentSortKey;
-          // Make column text more user-friendly
-          const columnMap = {{
-              'Retailer': 'Retailer', 'Title': 'Product', 'Capacity_TB': 'Size (TB)',
-              'Price': 'Price', 'Price_per_TB': '$/TB', '#': '#'
-          }};
-          columnText = columnMap[currentSortKey] || currentSortKey;
-          currentSortIndicator.textContent = `Sorted by: ${{columnText}} ${{directionArrow}}`;
-          
-          sortButtons.forEach(button => {{
-              button.classList.remove('active-sort');
-              if (button.dataset.sortKey === currentSortKey) {{
-                  button.classList.add('active-sort');
-              }}
-          }});
-      }}
+    start_time = datetime.datetime.now()
+    logging.info(f"Script started at: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
 
-      function applyFiltersAndRender() {{
-          // 1. Get selected retailers
-          const selectedRetailers = Array.from(retailerFiltersContainer.querySelectorAll('input[type="checkbox"]:checked'))
-                                     .map(cb => cb.value);
-          currentFilters.retailer = selectedRetailers;
+    all_results = []
+    scraper_status = {}
 
-          // 2. Filter raw data based on all current filters
-          let filteredData = rawDriveData.filter(item => {{
-              if (currentFilters.retailer && currentFilters.retailer.length > 0) {{
-                  if (!currentFilters.retailer.includes(item.Retailer)) return false;
-              }}
-              // Add other filter conditions here
-              return true;
-          }});
-
-          // 3. Sort the filtered data
-          // (The sortData function was modified to take filteredData if needed, but here we sort 'in-place' the global filteredData)
-           filteredData.sort((a, b) => {{
-              let valA = a[currentSortKey];
-              let valB = b[currentSortKey];
-              if (currentSortKey === 'Price' || currentSortKey === 'Capacity_TB' || currentSortKey === 'Price_per_TB') {{
-                  valA = parseFloat(valA);
-                  valB = parseFloat(valB);
-              }} else if (typeof valA === 'string') {{
-                  valA = valA.toLowerCase();
-                  valB = valB.toLowerCase();
-              }}
-              if (valA < valB) return currentSortDirection === 'asc' ? -1 : 1;
-              if (valA > valB) return currentSortDirection === 'asc' ? 1 : -1;
-              return 0;
-          }});
+    # Define URLs/Search Terms
+    amazon_search_term = SEARCH_TERM
+    newegg_search_term = SEARCH_TERM
+    serverpartdeals_url = "https://serverpartdeals.com/collections/manufacturer-recertified-drives"
 
-          // 4. Render the table with this filtered and sorted data
-          renderTable(filteredData);
-          updateSortIndicator();
-      }}
-
-      sortButtons.forEach(button => {{
-          button.addEventListener('click', (e) => {{
-              // Use currentTarget if event bubbles from an inner element of TH
-              const sortByKey = e.currentTarget.dataset.sortKey;
-              if (sortByKey === '#') return; // Don't sort by rank
-
-              if (currentSortKey === sortByKey) {{
-                  currentSortDirection = currentSortDirection === 'asc' ? 'desc' : 'asc';
-              }} else {{
-                  currentSortKey = sortByKey;
-                  currentSortDirection = 'asc';
-              }}
-              applyFiltersAndRender();
-          }});
-      }});
+    # --- Define Output Path for the static HTML report ---
+    # Save to a 'pages' directory in the project root (or 'reports' as we discussed)
+    # For GitHub Pages, if your repo is 'my-repo', files in 'pages/' are at 'my-repo/pages/'
+    output_dir = Path('pages')
+    output_dir.mkdir(exist_ok=True)
+    html_output_filename = output_dir / "hdd_prices_report.html"
 
-      // Initial Setup
-      if (rawDriveData && rawDriveData.length > 0) {{
-          populateRetailerFilters();
-          applyFiltersAndRender(); // Initial render
-      }} else {{
-          renderTable([]); // Render "no data" message
-          // Optionally disable controls if no data
-          document.querySelector('.controls-container').style.display = 'none';
-      }}
-    </script>
-</body>
-</html>"""
+    # Static CSS/JS live beside the report and are only rewritten on change.
+    css_hash = _write_static_asset(output_dir / "style.css", _REPORT_CSS)
+    js_hash = _write_static_asset(output_dir / "app.js", _REPORT_JS)
+
+    # --- Run Scrapers ---
+    # Amazon (pure requests) runs in parallel with the two Selenium scrapers;
+    # the latter run back to back so they can share a single Firefox driver
+    # and pay browser startup/teardown only once per run.
+    def _run_selenium_scrapers():
+        selenium_outcomes = {}
+        try:
+            with firefox_driver() as driver:
+                for site, func, args in (
+                        ('Newegg', scrape_newegg, (newegg_search_term,)),
+                        ('ServerPartDeals', scrape_serverpartdeals, (serverpartdeals_url,))):
+                    try:
+                        selenium_outcomes[site] = func(*args, driver=driver)
+                    except Exception as e:
+                        logging.error(f"{site} scraper failed critically: {e}", exc_info=True)
+                        selenium_outcomes[site] = e
+        except Exception as e:
+            logging.error(f"Shared Selenium driver setup failed: {e}", exc_info=True)
+            for site in ('Newegg', 'ServerPartDeals'):
+                selenium_outcomes.setdefault(site, e)
+        return selenium_outcomes
+
+    details_by_site = {
+        'Amazon': f"{MAX_PAGES_PER_SITE} page(s)",
+        'Newegg': "1 large page",
+        'ServerPartDeals': "1 page",
+    }
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        amazon_future = executor.submit(scrape_amazon, amazon_search_term, max_pages=MAX_PAGES_PER_SITE)
+        selenium_future = executor.submit(_run_selenium_scrapers)
+        try:
+            site_outcomes = {'Amazon': amazon_future.result()}
+        except Exception as e:
+            logging.error(f"Amazon scraper failed critically: {e}", exc_info=True)
+            site_outcomes = {'Amazon': e}
+        site_outcomes.update(selenium_future.result())
+
+    for site in ('Amazon', 'Newegg', 'ServerPartDeals'):
+        outcome = site_outcomes[site]
+        if isinstance(outcome, Exception):
+            scraper_status[site] = {"status": "Failed", "error": type(outcome).__name__}
+        else:
+            all_results.extend(outcome)
+            scraper_status[site] = {"status": "Success", "count": len(outcome), "details": details_by_site[site]}
+
+
+    end_time = datetime.datetime.now()
+    logging.info(f"All scraping finished at: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    try:
+        last_updated_str = end_time.astimezone().strftime('%Y-%m-%d %H:%M:%S %Z')
+    except ValueError:
+        last_updated_str = end_time.strftime('%Y-%m-%d %H:%M:%S')
+
+    # --- Prepare Status Message for HTML ---
+    status_lines_html = []
+    for site_name, site_data in scraper_status.items():
+        if site_data['status'] == 'Success':
+            details = f", {site_data.get('details', '')}" if site_data.get('details') else ''
+            status_lines_html.append(f"<li>{site_name}: {site_data['status']} ({site_data.get('count', 0)} items{details})</li>")
+        else:
+            status_lines_html.append(f"<li><strong style='color: var(--error-text, #cc0000);'>{site_name}: {site_data['status']}</strong> (Error: {site_data.get('error', 'Unknown')})</li>")
+
+    status_html_for_report = f"<ul>{''.join(status_lines_html)}</ul>"
+    status_note_html = ""
+    if 'Failed' in [s_data['status'] for s_data in scraper_status.values()]:
+         status_note_html = "<p style='color: orange; text-align: center; font-size: 0.9em;'>Note: One or more scrapers failed. Results may be incomplete. Check console logs for details.</p>"
+
+    # --- Process Combined Data for JavaScript ---
+    no_data_message_html = ""
+    js_data_json_string = "{}" # Default to empty columnar payload
+
+    if not all_results:
+        logging.warning("\nNo valid hard drive data found from ANY retailer after parsing.")
+        no_data_message_html = f"""
+        <div class="error-container">
+            <p class="error">No valid hard drive data found from any retailer after parsing.</p>
+            <p class="error-detail">Please check the script's console output for potential errors.</p>
+        </div>
+        """
+    else:
+        df = pd.DataFrame(all_results)
+        # Vectorized $/TB: one array division instead of a Python lambda per row.
+        # to_numeric coerces any stray non-numeric values to NaN and .where
+        # masks non-positive capacities, so NaN propagates into the quotient
+        # and the dropna below removes those rows, matching the old row-wise logic.
+        capacities = pd.to_numeric(df['Capacity (TB)'], errors='coerce')
+        prices = pd.to_numeric(df['Price'], errors='coerce')
+        df['Price per TB ($)'] = (prices / capacities.where(capacities > 0)).round(2)
+        df.dropna(subset=['Price per TB ($)', 'Capacity (TB)', 'Price', 'Title', 'URL', 'Retailer'], inplace=True)
+        df_sorted = df.sort_values(by=['Price per TB ($)', 'Retailer'], ascending=True).reset_index(drop=True)
+
+        if df_sorted.empty:
+             no_data_message_html = f"""
+             <div class="error-container">
+                 <p class="error">No drives found after filtering and calculation.</p>
+            </div>
+            """
+        else:
+            # Columnar payload: one array per field instead of an array of
+            # record dicts, so the six key strings are not repeated for every
+            # row — roughly 60 bytes saved per drive before compression.
+            js_data_cols = {
+                'Retailer': df_sorted['Retailer'].tolist(),
+                'Title': df_sorted['Title'].tolist(),
+                'URL': df_sorted['URL'].tolist(),
+                'Capacity_TB': df_sorted['Capacity (TB)'].tolist(),
+                'Price': df_sorted['Price'].tolist(),
+                'Price_per_TB': df_sorted['Price per TB ($)'].tolist(),
+            }
+            js_data_json_string = _dumps_json(js_data_cols)
+
+    # --- Construct Full HTML Page ---
+    # The table body is rendered exclusively client-side from rawDriveData:
+    # applyFiltersAndRender() repopulates the tbody on load anyway, so any
+    # server-rendered rows were built, written, parsed, and then thrown away.
+    # Dropping them roughly halves the emitted HTML.
+    html_prologue = _REPORT_PROLOGUE_TMPL.format(
+        css_hash=css_hash,
+        last_updated_str=last_updated_str,
+        status_html_for_report=status_html_for_report,
+        no_data_message_html=no_data_message_html,
+    )
+
+    html_epilogue = _REPORT_EPILOGUE_TMPL.format(
+        status_note_html=status_note_html,
+        js_data_json_string=js_data_json_string,
+        js_hash=js_hash,
+    )
 
     # --- Save HTML to File ---
     try:
-        with open(html_output_filename, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        logging.info(f"\nHTML Results successfully saved to: {os.path.abspath(html_output_filename)}")
-        print(f"\nHTML report generated: {os.path.abspath(html_output_filename)}")
+        with html_output_filename.open('w', encoding='utf-8') as f:
+            f.write(html_prologue)
+            f.write(html_epilogue)
+        # Precompressed siblings: static hosts that negotiate Content-Encoding
+        # serve these directly instead of compressing per request; local
+        # viewing keeps using the plain .html. Both compressors consume the
+        # document piecewise, so it is never concatenated into one string.
+        prologue_bytes = html_prologue.encode('utf-8')
+        epilogue_bytes = html_epilogue.encode('utf-8')
+        with gzip.open(f"{html_output_filename}.gz", 'wb', compresslevel=6) as gz:
+            gz.write(prologue_bytes)
+            gz.write(epilogue_bytes)
+        if brotli is not None:
+            # Isolated: a brotli failure (e.g. brotlipy's incompatible
+            # Compressor API under the same import name) must not mark the
+            # already-written .html/.gz as a save error.
+            try:
+                compressor = brotli.Compressor(quality=11)
+                with open(f"{html_output_filename}.br", 'wb') as br:
+                    br.write(compressor.process(prologue_bytes))
+                    br.write(compressor.process(epilogue_bytes))
+                    br.write(compressor.finish())
+            except Exception as br_err:
+                logging.warning(f"Skipping optional .br precompression: {br_err}")
+        logging.info(f"\nHTML Results successfully saved to: {html_output_filename.resolve()}")
+        print(f"\nHTML report generated: {html_output_filename.resolve()}")
     except Exception as e:
         logging.error(f"\nError saving HTML file '{html_output_filename}': {e}")
         print(f"\nError saving HTML file: {e}")